@@ -0,0 +1,143 @@
+import pandas as pd
+
+# ==========================================
+# BASE FÍSICA DA POSIÇÃO (PALETE PBR)
+# ==========================================
+# A altura vem do Tp.posição (P160 → 160 cm); a base é a do palete padrão
+LARGURA_PALETE_CM = 100
+PROFUNDIDADE_PALETE_CM = 120
+AREA_BASE_M2 = LARGURA_PALETE_CM * PROFUNDIDADE_PALETE_CM / 10_000
+
+# Converte a unidade de volume do export de estoque (SAP) para m³
+FATOR_VOLUME_M3 = {
+    'M3': 1.0,
+    'DM3': 0.001,
+    'CDM': 0.001,
+    'L': 0.001,
+    'CM3': 0.000001,
+    'CCM': 0.000001,
+}
+
+# Converte a unidade de dimensão (altura da carga) para cm
+FATOR_DIMENSAO_CM = {
+    'M': 100.0,
+    'CM': 1.0,
+    'MM': 0.1,
+}
+
+COLUNAS_SOMA = ['Posicoes', 'Ocupadas', 'Capacidade_m3', 'Volume_ocupado_m3']
+# Só existem quando o export de estoque traz a altura da carga
+COLUNAS_SOMA_ALTURA = ['Altura_cm', 'Altura_ocupada_cm']
+
+
+# ==========================================
+# VOLUME DO ESTOQUE (QUANDO O EXPORT TRAZ)
+# ==========================================
+def volume_estoque_m3(df):
+    """
+    Volume de cada linha de estoque em m³.
+    Retorna None quando o export não tem a coluna 'Volume'.
+    """
+    if 'Volume' not in df.columns:
+        return None
+    return _converter_unidade(df, 'Volume', 'Unidade_de_volume', FATOR_VOLUME_M3)
+
+
+def altura_carga_cm(df):
+    """
+    Altura da carga (unidade de manuseio) de cada linha de estoque em cm.
+    Retorna None quando o export não tem a coluna 'Altura'.
+    """
+    if 'Altura' not in df.columns:
+        return None
+    return _converter_unidade(df, 'Altura', 'Unidade_de_dimensao', FATOR_DIMENSAO_CM)
+
+
+def _converter_unidade(df, coluna, coluna_unidade, fatores):
+    # A carga já converteu a vírgula decimal; aqui só garante o dtype
+    valor = pd.to_numeric(df[coluna], errors='coerce')
+
+    if coluna_unidade in df.columns:
+        fator = (
+            df[coluna_unidade]
+            .astype(str)
+            .str.strip()
+            .str.upper()
+            .map(fatores)
+            .fillna(1.0)
+        )
+        valor = valor * fator
+
+    return valor
+
+
+# ==========================================
+# UTILIZAÇÃO POR POSIÇÃO (UMA LINHA POR ENDEREÇO)
+# ==========================================
+def utilizacao_por_posicao(df):
+    """
+    Consolida o df completo (pode ter vários quants por endereço) em uma
+    linha por posição, com capacidade e ocupação cúbica e de altura.
+
+    Sem volume no export, posição ocupada conta como palete cheio.
+    Sem altura da carga no export não há utilização de altura (as colunas
+    ficam de fora em vez de repetir a ocupação).
+    """
+    ocupado = df['Status'] == 'Ocupado'
+    volume = volume_estoque_m3(df)
+    altura_carga = altura_carga_cm(df)
+
+    base = pd.DataFrame({
+        'Posicao_no_deposito': df['Posicao_no_deposito'],
+        'Área_Exibicao': df['Área_Exibicao'],
+        'Corredor': df['Corredor'],
+        'Nivel': df['Nivel'],
+        'Altura_cm': df['Altura_cm'],
+        'Ocupado': ocupado,
+        'Volume_ocupado_m3': volume.where(ocupado) if volume is not None else float('nan'),
+        'Altura_carga_cm': altura_carga.where(ocupado) if altura_carga is not None else float('nan'),
+    })
+
+    grupos = base.groupby('Posicao_no_deposito', sort=False)
+    posicoes = grupos[['Área_Exibicao', 'Corredor', 'Nivel', 'Altura_cm']].first()
+    posicoes['Ocupado'] = grupos['Ocupado'].max()
+    posicoes['Volume_ocupado_m3'] = grupos['Volume_ocupado_m3'].sum(min_count=1)
+
+    posicoes['Posicoes'] = 1
+    posicoes['Ocupadas'] = posicoes['Ocupado'].astype(int)
+    posicoes['Capacidade_m3'] = AREA_BASE_M2 * posicoes['Altura_cm'] / 100
+
+    # Ocupada sem volume informado -> palete cheio; nunca passa da capacidade
+    volume_pos = posicoes['Volume_ocupado_m3'].fillna(posicoes['Capacidade_m3'].where(posicoes['Ocupado'], 0))
+    posicoes['Volume_ocupado_m3'] = volume_pos.clip(lower=0, upper=posicoes['Capacidade_m3'])
+
+    if altura_carga is not None:
+        # Quants no mesmo endereço ficam lado a lado: a carga mais alta define a altura usada.
+        # Ocupada sem altura informada -> altura cheia (mesma regra do volume)
+        altura_pos = grupos['Altura_carga_cm'].max().fillna(posicoes['Altura_cm'].where(posicoes['Ocupado'], 0))
+        posicoes['Altura_ocupada_cm'] = altura_pos.clip(lower=0, upper=posicoes['Altura_cm'])
+
+    return _com_percentuais(posicoes)
+
+
+# ==========================================
+# AGREGAÇÃO (NÍVEL / CORREDOR / ÁREA)
+# ==========================================
+def agregar_utilizacao(posicoes, chaves):
+    """Soma as capacidades por grupo e recalcula os percentuais."""
+    tem_altura = 'Altura_ocupada_cm' in posicoes.columns
+    colunas = COLUNAS_SOMA + (COLUNAS_SOMA_ALTURA if tem_altura else [])
+    agregado = posicoes.groupby(chaves, sort=True)[colunas].sum()
+    return _com_percentuais(agregado).reset_index()
+
+
+def _com_percentuais(df):
+    """
+    Util_cubica: volume ocupado / volume disponível.
+    Util_altura: altura das cargas / altura das posições (Tp.posição), só
+    quando o export traz a altura da carga.
+    """
+    df['Util_cubica'] = (100 * df['Volume_ocupado_m3'] / df['Capacidade_m3']).fillna(0).round(1)
+    if 'Altura_ocupada_cm' in df.columns:
+        df['Util_altura'] = (100 * df['Altura_ocupada_cm'] / df['Altura_cm']).fillna(0).round(1)
+    return df
@@ -0,0 +1,344 @@
+import io
+import os
+import pickle
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from validacao import celulas_texto, numero_ambiguo, tem_erro_grave, validar_estoque, validar_layout
+
+# Caminho do export de layout do SAP (fica junto do app)
+CAMINHO_LAYOUT = "EXPORT_20260224_122851.xlsx - Data.csv"
+
+
+# ===== NORMALIZADOR UNIVERSAL DE COLUNAS =====
+def normalizar_colunas(df):
+    df.columns = (
+        df.columns
+        .str.strip()
+        .str.normalize("NFKD")
+        .str.encode("ascii", errors="ignore")
+        .str.decode("utf-8")
+        .str.replace(" ", "_", regex=False)
+        .str.replace(".", "", regex=False)
+        .str.replace("/", "_", regex=False)
+    )
+    return df
+
+
+# ==========================================
+# EXTRAI ALTURA REAL DO NÍVEL (P160 → 160)
+# ==========================================
+def extrair_altura(tp):
+    """
+    Converte valores como:
+    P160 -> 160
+    P120 -> 120
+    """
+    if pd.isna(tp):
+        return 160  # altura padrão de segurança
+
+    numeros = ''.join(filter(str.isdigit, str(tp)))
+    return int(numeros) if numeros else 160
+
+
+# ==========================================
+# NÚMEROS E DATAS NO FORMATO BRASILEIRO
+# ==========================================
+# Colunas do estoque que chegam como texto com vírgula decimal ('1,5')
+COLUNAS_NUMERICAS_ESTOQUE = ['Quantidade', 'Volume', 'Altura']
+
+# Tentados em ordem; ISO antes do fallback para dayfirst não inverter 2026-03-12
+FORMATOS_DATA = ['%d/%m/%Y', '%d.%m.%Y', 'ISO8601', '%d/%m/%Y %H:%M:%S']
+
+
+def converter_numero(serie):
+    """
+    Formato decidido por coluna: com alguma vírgula, ponto é milhar em
+    todas as células ('1.234' -> 1234, '1,5' -> 1.5). Sem vírgula, o
+    formato é o padrão, mas '1.234' é ambíguo e vira NaN (a validação
+    reporta). O que não converte vira NaN.
+    """
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie
+
+    e_texto = celulas_texto(serie)
+    texto = serie[e_texto].astype(str).str.strip()
+    if texto.str.contains(',', regex=False).any():
+        texto = texto.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    else:
+        texto = texto.mask(numero_ambiguo(serie)[e_texto])
+
+    if e_texto.all():
+        return pd.to_numeric(texto, errors='coerce')
+
+    # Excel: células numéricas passam direto, só o texto é interpretado
+    numero = pd.to_numeric(serie.where(~e_texto), errors='coerce').astype(float)
+    numero[e_texto] = pd.to_numeric(texto, errors='coerce')
+    return numero
+
+
+def converter_data(serie):
+    """
+    Datas dd/mm/aaaa (padrão BR). Sem dayfirst o pandas adivinha mês/dia
+    pela primeira linha e reprova o resto do arquivo.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+
+    texto = serie.astype(str).str.strip()
+    datas = pd.Series(pd.NaT, index=serie.index, dtype='datetime64[ns]')
+
+    for formato in FORMATOS_DATA:
+        faltando = datas.isna() & serie.notna()
+        if not faltando.any():
+            return datas
+        datas[faltando] = pd.to_datetime(texto[faltando], format=formato, errors='coerce')
+
+    # Formatos fora da lista (ex: 12-03-26): dia primeiro, elemento a elemento
+    faltando = datas.isna() & serie.notna()
+    if faltando.any():
+        datas[faltando] = pd.to_datetime(texto[faltando], dayfirst=True, format='mixed', errors='coerce')
+
+    return datas
+
+
+# ==========================================
+# POOL DE PROCESSOS (CARGA PARALELA)
+# ==========================================
+def _aquecer(_):
+    """Tarefa vazia: força o worker a subir e importar pandas/pyarrow."""
+    return os.getpid()
+
+
+def criar_pool(max_workers=None):
+    """
+    Cria o pool usado na carga.
+
+    forkserver em vez de fork: o servidor do Streamlit roda com várias
+    threads e fork nesse cenário pode travar. O servidor do forkserver já
+    importa este módulo (pandas/pyarrow), então cada worker sobe rápido.
+    Sem forkserver (Windows) usa spawn.
+
+    Os workers reimportam o script principal (app.py) como __mp_main__;
+    ele só monta a interface sob `if __name__ == "__main__"`.
+    """
+    if max_workers is None:
+        max_workers = max(1, min(4, os.cpu_count() or 1))
+
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        contexto = multiprocessing.get_context("forkserver")
+        contexto.set_forkserver_preload(["carga", "streamlit"])
+    else:
+        contexto = multiprocessing.get_context("spawn")
+
+    pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=contexto)
+
+    # Sobe todos os workers agora: a primeira carga não paga a partida
+    list(pool.map(_aquecer, range(max_workers)))
+
+    return pool
+
+
+# ==========================================
+# TRANSPORTE ENTRE PROCESSOS (ARROW EM MEMÓRIA COMPARTILHADA)
+# ==========================================
+# O worker grava um arquivo Arrow IPC em /dev/shm e devolve só o caminho;
+# o processo principal mapeia o arquivo em memória, sem passar o
+# DataFrame pelo pipe do pool (pickle)
+DIRETORIO_COMPARTILHADO = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+def _texto_em_colunas_mistas(df):
+    """
+    Excel (openpyxl) costuma trazer colunas object com int e str juntos
+    (ex: Produto 123 e 'ABC-1'); o Arrow recusa. Essas viram texto,
+    mantendo os vazios.
+    """
+    mistas = [
+        c for c in df.columns
+        if df[c].dtype == object and pd.api.types.infer_dtype(df[c], skipna=True).startswith('mixed')
+    ]
+    if not mistas:
+        return df
+
+    return df.astype({c: 'string' for c in mistas})
+
+
+def serializar(df):
+    """
+    Grava o DataFrame como arquivo Arrow na memória compartilhada e
+    retorna ("arrow", caminho). Se o Arrow não converter ou o /dev/shm
+    estiver cheio (Docker limita a 64 MB por padrão), cai no pickle.
+    """
+    try:
+        tabela = pa.Table.from_pandas(_texto_em_colunas_mistas(df), preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return ("pickle", pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL))
+
+    fd, caminho = tempfile.mkstemp(prefix="simulador_", suffix=".arrow", dir=DIRETORIO_COMPARTILHADO)
+    os.close(fd)
+    try:
+        with pa.OSFile(caminho, "wb") as arquivo, pa.ipc.new_file(arquivo, tabela.schema) as writer:
+            writer.write_table(tabela)
+    except OSError:
+        os.unlink(caminho)
+        return ("pickle", pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL))
+
+    return ("arrow", caminho)
+
+
+def desserializar(pacote):
+    """Lê o pacote de serializar; o arquivo compartilhado é apagado em seguida."""
+    formato, dado = pacote
+    if formato == "pickle":
+        return pickle.loads(dado)
+
+    try:
+        with pa.memory_map(dado) as mapa:
+            return pa.ipc.open_file(mapa).read_all().to_pandas()
+    finally:
+        os.unlink(dado)
+
+
+def no_worker(ler, *args):
+    """Roda ler_layout/ler_estoque no worker e empacota o DataFrame para o transporte."""
+    df, relatorio = ler(*args)
+    return (serializar(df) if df is not None else None), relatorio
+
+
+def desempacotar(resultado):
+    pacote, relatorio = resultado
+    return (desserializar(pacote) if pacote is not None else None), relatorio
+
+
+def descartar(futuro):
+    """Callback para resultado que não será lido: apaga o arquivo compartilhado."""
+    if futuro.cancelled() or futuro.exception() is not None:
+        return
+    pacote = futuro.result()[0]
+    if pacote is not None and pacote[0] == "arrow":
+        os.remove(pacote[1])
+
+
+# ==========================================
+# LEITURA DO LAYOUT (RODA NO WORKER)
+# ==========================================
+def ler_layout(caminho=CAMINHO_LAYOUT):
+    """Retorna (df_layout, relatorio); df_layout é None se a validação reprovar."""
+    if caminho.endswith(".csv"):
+        df_layout = pd.read_csv(caminho, encoding="latin-1", sep=";")
+    else:
+        df_layout = pd.read_excel(caminho)
+
+    df_layout = normalizar_colunas(df_layout)
+
+    # Falha rápido: layout inválido não chega nas colunas derivadas
+    relatorio = validar_layout(df_layout)
+    if tem_erro_grave(relatorio):
+        return None, relatorio
+
+    df_layout[['Corredor', 'Coluna', 'Nivel', 'Posicao_Extra']] = df_layout['Posicao_no_deposito'].str.split('-', expand=True)
+    df_layout['Corredor'] = pd.to_numeric(df_layout['Corredor'])
+    df_layout['Coluna'] = pd.to_numeric(df_layout['Coluna'])
+    df_layout['Nivel'] = pd.to_numeric(df_layout['Nivel'])
+
+    # Cálculo Y para Visão Macro (par +0.8, ímpar -0.8)
+    coluna_par = df_layout['Coluna'] % 2 == 0
+    df_layout['Y_Plot'] = df_layout['Corredor'] * 3 + np.where(coluna_par, 0.8, -0.8)
+
+    # Cálculo Y para Visão Micro (Ímpar -1, Par 1)
+    df_layout['Y_Micro'] = np.where(coluna_par, 1, -1)
+    df_layout['Área_Exibicao'] = df_layout['Area_armazmto'].fillna('Desconhecido')
+
+    # ==========================================
+    # ALTURA REAL DO NÍVEL (BASEADO NO SAP)
+    # ==========================================
+    df_layout['Altura_cm'] = df_layout['Tpposicao_deposito'].map(extrair_altura)
+
+    # converte para escala 3D (metros visuais)
+    df_layout['Altura_plot'] = df_layout['Altura_cm'] / 100
+
+    return df_layout, relatorio
+
+
+# ==========================================
+# LEITURA DE UM SNAPSHOT DE ESTOQUE (RODA NO WORKER)
+# ==========================================
+def ler_estoque(nome, conteudo):
+    """
+    Recebe nome e bytes do upload (UploadedFile não atravessa processos).
+    Retorna (dados_estoque, relatorio); dados_estoque é None se a validação reprovar.
+    """
+    if nome.endswith('.csv'):
+        # Tudo como texto: o read_csv leria '1.234' como 1,234 antes de a
+        # coluna ter o formato decidido (converter_numero)
+        try:
+            dados_estoque = pd.read_csv(io.BytesIO(conteudo), sep=None, engine='python', encoding='utf-8', dtype=str)
+        except UnicodeDecodeError:
+            dados_estoque = pd.read_csv(io.BytesIO(conteudo), sep=None, engine='python', encoding='latin-1', dtype=str)
+    else:
+        dados_estoque = pd.read_excel(io.BytesIO(conteudo))
+
+    dados_estoque = normalizar_colunas(dados_estoque)
+
+    # Após normalizar_colunas o cabeçalho 'Data do vencimento' vira 'Data_do_vencimento'
+    if 'Data_do_vencimento' in dados_estoque.columns:
+        dados_estoque = dados_estoque.rename(columns={'Data_do_vencimento': 'Vencimento'})
+
+    # Guarda as colunas cruas: o que era preenchido e não converteu é erro de dado
+    originais = {}
+    for coluna in COLUNAS_NUMERICAS_ESTOQUE:
+        if coluna in dados_estoque.columns:
+            originais[coluna] = dados_estoque[coluna]
+            dados_estoque[coluna] = converter_numero(originais[coluna])
+    if 'Vencimento' in dados_estoque.columns:
+        originais['Vencimento'] = dados_estoque['Vencimento']
+        dados_estoque['Vencimento'] = converter_data(originais['Vencimento'])
+
+    relatorio = validar_estoque(dados_estoque, originais)
+    if tem_erro_grave(relatorio):
+        return None, relatorio
+
+    return dados_estoque, relatorio
+
+
+# ==========================================
+# MONTA O DATAFRAME FINAL (LAYOUT + ESTOQUE)
+# ==========================================
+def montar_completo(df_layout, dados_estoque=None):
+    if dados_estoque is not None:
+        df_completo = pd.merge(df_layout, dados_estoque, on="Posicao_no_deposito", how="left")
+
+        df_completo['Produto'] = df_completo.get('Produto', pd.Series(['-']*len(df_completo))).fillna('-')
+        df_completo['Quantidade'] = df_completo.get('Quantidade', pd.Series([0]*len(df_completo))).fillna(0)
+        df_completo['Descrição produto'] = df_completo.get('Descrição produto', pd.Series(['-']*len(df_completo))).fillna('-')
+        df_completo['Unidade comercial'] = df_completo.get('Unidade comercial', pd.Series(['-']*len(df_completo))).fillna('-')
+
+        df_completo['Status'] = np.where(df_completo['Produto'].astype(str) != '-', 'Ocupado', 'Vazio')
+
+        hoje = pd.Timestamp.today()
+        if 'Vencimento' in df_completo.columns:
+            df_completo['Vencido'] = (df_completo['Vencimento'] < hoje) & (df_completo['Status'] == 'Ocupado')
+        else:
+            df_completo['Vencido'] = False
+    else:
+        df_completo = df_layout.copy()
+        df_completo['Status'] = 'Vazio'
+        df_completo['Vencido'] = False
+        df_completo['Vencimento'] = pd.NaT
+        df_completo['Produto'] = '-'
+        df_completo['Descrição produto'] = '-'
+        df_completo['Unidade comercial'] = '-'
+        df_completo['Quantidade'] = 0
+
+    df_completo['Cor_Plot'] = np.where(
+        df_completo['Status'] == 'Vazio',
+        ' ESTRUTURA VAZIA',
+        df_completo['Área_Exibicao'].astype(str),
+    )
+    return df_completo
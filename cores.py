@@ -0,0 +1,58 @@
+import numpy as np
+
+# ==========================================
+# PALETAS (PARSEADAS UMA VEZ, NA IMPORTAÇÃO)
+# ==========================================
+PALETA_AREAS_HEX = np.array([
+    '#1f77b4', '#2ca02c', '#ff7f0e',
+    '#9467bd', '#8c564b', '#17becf',
+    '#e377c2', '#7f7f7f', '#bcbd22'
+])
+
+COR_MONTANTE_HEX = '#2c3e50'
+COR_VIGA_HEX = '#e67e22'
+
+
+def hex_para_rgb(cores_hex):
+    """['#1f77b4', ...] -> array (n, 3) uint8, sem laço em Python."""
+    cores = np.char.lstrip(np.atleast_1d(np.asarray(cores_hex, dtype=str)), '#')
+    return np.frombuffer(bytes.fromhex(''.join(cores)), dtype=np.uint8).reshape(-1, 3)
+
+
+PALETA_AREAS_RGB = hex_para_rgb(PALETA_AREAS_HEX)
+COR_MONTANTE_RGB = hex_para_rgb(COR_MONTANTE_HEX)[0]
+COR_VIGA_RGB = hex_para_rgb(COR_VIGA_HEX)[0]
+
+
+# ==========================================
+# SOMBREAMENTO POR ALTURA (ILUMINAÇÃO FAKE)
+# ==========================================
+def sombrear_por_altura(rgb, alturas, altura_max):
+    """
+    Clareia a cor conforme a altura (simula luz vindo de cima).
+    `rgb` é uma cor (3,) ou uma por item (n, 3); `alturas` é (n,).
+    Retorna (n, 3) uint8.
+    """
+    fator = 0.55 + (np.asarray(alturas, dtype=float) / altura_max) * 0.45
+    sombreado = np.asarray(rgb, dtype=float) * fator[:, None]
+    return np.minimum(255, sombreado.astype(np.int64)).astype(np.uint8)
+
+
+# ==========================================
+# EMPACOTAMENTO PARA O PLOTLY
+# ==========================================
+def rgb_para_hex(rgb):
+    """(n, 3) uint8 -> array de '#rrggbb' (formato aceito por facecolor/marker.color)."""
+    rgb = np.asarray(rgb, dtype=np.uint32).reshape(-1, 3)
+    empacotado = (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+    return np.char.mod('#%06x', empacotado)
+
+
+def cores_por_area(n_areas):
+    """Cor da i-ésima área (em ordem alfabética), repetindo a paleta."""
+    return PALETA_AREAS_HEX[np.arange(n_areas) % len(PALETA_AREAS_HEX)]
+
+
+def contorno_vencidos(vencido, cor_vencido, cor_normal):
+    """Cor da borda de cada ponto: destaca os vencidos numa passada só."""
+    return np.where(np.asarray(vencido, dtype=bool), cor_vencido, cor_normal)
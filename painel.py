@@ -0,0 +1,876 @@
+import streamlit as st
+
+st.set_page_config(page_title="Simulador de Estoque 3D", layout="wide")
+st.title("📦 Simulador de Estoque 3D - CD Passo Fundo")
+
+# ==========================================
+# IMPORTS PESADOS (DEPOIS DO PRIMEIRO PAINT)
+# ==========================================
+# Plotly e o componente de cliques são importados só onde são usados
+import numpy as np
+import pandas as pd
+from collections import Counter
+from concurrent.futures.process import BrokenProcessPool
+from capacidade import agregar_utilizacao, utilizacao_por_posicao
+from cores import COR_MONTANTE_RGB, COR_VIGA_RGB, contorno_vencidos, cores_por_area, rgb_para_hex, sombrear_por_altura
+from carga import CAMINHO_LAYOUT, criar_pool, desempacotar, descartar, ler_estoque, ler_layout, montar_completo, no_worker
+from repositorio import RepositorioDatasets, chave_arquivo, medir_bytes
+from validacao import tem_erro_grave, validar_cruzamento
+
+# ==============================
+# EIXO 3D PADRÃO (GLOBAL)
+# ==============================
+eixo_invisivel = dict(
+    showbackground=False,
+    showgrid=False,
+    zeroline=False,
+    showticklabels=False,
+)
+
+def formata_br(numero):
+    return f"{numero:,.0f}".replace(",", ".")
+
+def formata_mb(num_bytes):
+    return f"{num_bytes / 1024 ** 2:.1f} MB".replace(".", ",")
+
+
+# ==============================
+# FUNÇÃO PARA DESENHAR 3D (Racks)
+# ==============================
+# Vértices e triângulos de uma caixa (mesma ordem para todas)
+CAIXA_OX = np.array([0, 1, 1, 0, 0, 1, 1, 0])
+CAIXA_OY = np.array([0, 0, 1, 1, 0, 0, 1, 1])
+CAIXA_OZ = np.array([0, 0, 0, 0, 1, 1, 1, 1])
+CAIXA_I = np.array([0,0,0,1,1,2,4,5,6,4,5,6])
+CAIXA_J = np.array([1,2,3,2,5,3,5,6,7,0,1,2])
+CAIXA_K = np.array([2,3,1,5,6,7,6,7,4,1,2,3])
+
+def criar_caixas(x, y, z, dx, dy, dz, cores_rgb, opacity=1.0):
+    """
+    Gera N blocos 3D sólidos num único Mesh3d (estrutura metálica da estante).
+    Cada argumento é um escalar ou um array (N,); `cores_rgb` é (N, 3).
+    """
+    import plotly.graph_objects as go
+
+    x, y, z, dx, dy, dz = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (x, y, z, dx, dy, dz)))
+    base = np.arange(x.size)[:, None] * 8
+
+    return go.Mesh3d(
+        x=(x[:, None] + CAIXA_OX * dx[:, None]).ravel(),
+        y=(y[:, None] + CAIXA_OY * dy[:, None]).ravel(),
+        z=(z[:, None] + CAIXA_OZ * dz[:, None]).ravel(),
+        i=(base + CAIXA_I).ravel(),
+        j=(base + CAIXA_J).ravel(),
+        k=(base + CAIXA_K).ravel(),
+        facecolor=np.repeat(rgb_para_hex(cores_rgb), len(CAIXA_I)),
+        opacity=opacity, flatshading=True, hoverinfo='skip', showscale=False
+    )
+
+# ==========================================
+# GERADOR DO MAPA DE CORES (ANTI-RERUN BUG)
+# ==========================================
+def gerar_mapa_cores(df):
+
+    mapa = {' ESTRUTURA VAZIA': 'gray'}
+
+    areas = [
+        a for a in df["Área_Exibicao"].unique()
+        if str(a) != "nan" and str(a) != "Desconhecido"
+    ]
+
+    areas.sort()
+
+    mapa.update(zip(areas, cores_por_area(len(areas)).tolist()))
+
+    return mapa
+
+# ==========================================
+# MOTOR DE CAPACIDADE (COMPARTILHADO POR DATASET)
+# ==========================================
+# Rótulo do modo de cor -> coluna de utilização
+COLUNAS_UTILIZACAO = {
+    "Utilização cúbica": "Util_cubica",
+    "Utilização de altura": "Util_altura",
+}
+
+def calcular_capacidade(df):
+    posicoes = utilizacao_por_posicao(df)
+    return {
+        'posicao': posicoes,
+        'nivel': agregar_utilizacao(posicoes, ['Nivel']),
+        'area': agregar_utilizacao(posicoes, ['Área_Exibicao']),
+        'area_corredor': agregar_utilizacao(posicoes, ['Área_Exibicao', 'Corredor']),
+        'corredor_nivel': agregar_utilizacao(posicoes, ['Corredor', 'Nivel']),
+    }
+
+
+# --- BARRA LATERAL: UPLOAD DE ARQUIVO ---
+st.sidebar.header("📁 1. Carga de Dados")
+arquivos_estoque = st.sidebar.file_uploader(
+    "Faça upload do Estoque (Excel ou CSV) — aceita vários snapshots",
+    type=["xlsx", "csv"],
+    accept_multiple_files=True,
+)
+
+# =====================================================
+# POOL DE PROCESSOS (UM POR SERVIDOR, REUSADO ENTRE RERUNS)
+# =====================================================
+@st.cache_resource(show_spinner=False)
+def obter_pool():
+    return criar_pool()
+
+# =====================================================
+# DATASETS COMPARTILHADOS ENTRE SESSÕES (SEM CÓPIA)
+# =====================================================
+CHAVE_LAYOUT = "layout"
+CHAVE_SOMENTE_LAYOUT = "somente_layout"
+
+@st.cache_resource(show_spinner=False)
+def obter_repositorio():
+    return RepositorioDatasets()
+
+def ler_em_serie(incluir_layout, arquivos):
+    """Mesma leitura de ler_em_paralelo, no próprio processo."""
+    resultado_layout = ler_layout(CAMINHO_LAYOUT) if incluir_layout else None
+    if resultado_layout is not None and resultado_layout[0] is None:
+        return resultado_layout, {}
+    return resultado_layout, {chave: ler_estoque(nome, conteudo) for chave, (nome, conteudo) in arquivos.items()}
+
+def ler_em_paralelo(incluir_layout, arquivos):
+    """
+    Lê layout (se pedido) e os estoques em paralelo no pool.
+    `arquivos` é {chave_dataset: (nome, bytes)}.
+    Retorna (resultado_layout ou None, {chave_dataset: resultado_estoque}), cada
+    resultado como (DataFrame ou None se reprovado, relatorio).
+    """
+    pool = obter_pool()
+
+    try:
+        futuro_layout = pool.submit(no_worker, ler_layout, CAMINHO_LAYOUT) if incluir_layout else None
+        futuros_estoque = {
+            chave: pool.submit(no_worker, ler_estoque, nome, conteudo)
+            for chave, (nome, conteudo) in arquivos.items()
+        }
+        resultado_layout = desempacotar(futuro_layout.result()) if futuro_layout is not None else None
+
+        # Layout reprovado: nem espera os estoques (o que já rodou tem o arquivo apagado)
+        if resultado_layout is not None and resultado_layout[0] is None:
+            for futuro in futuros_estoque.values():
+                if not futuro.cancel():
+                    futuro.add_done_callback(descartar)
+            return resultado_layout, {}
+
+        return resultado_layout, {chave: desempacotar(futuro.result()) for chave, futuro in futuros_estoque.items()}
+
+    except BrokenProcessPool:
+        # Worker morreu (falta de memória, kill...): descarta o pool e lê aqui mesmo
+        obter_pool.clear()
+        return ler_em_serie(incluir_layout, arquivos)
+
+def rotular_uploads(nomes):
+    """Nomes repetidos (ex: EXPORT.XLSX de dias diferentes) viram 'EXPORT.XLSX (1)', '(2)'..."""
+    total = Counter(nomes)
+    vistos = Counter()
+    rotulos = []
+    for nome in nomes:
+        vistos[nome] += 1
+        rotulos.append(nome if total[nome] == 1 else f"{nome} ({vistos[nome]})")
+    return rotulos
+
+def chaves_uploads(arquivos):
+    """
+    Chave (sha256) de cada upload, calculada só quando o arquivo é novo:
+    fica no session_state pelo file_id, senão todo rerun copiaria e
+    hashearia todos os exports de novo.
+    """
+    cache = st.session_state.setdefault("chaves_upload", {})
+    ids_atuais = {arquivo.file_id for arquivo in arquivos}
+    for file_id in [f for f in cache if f not in ids_atuais]:
+        del cache[file_id]
+
+    for arquivo in arquivos:
+        if arquivo.file_id not in cache:
+            cache[arquivo.file_id] = chave_arquivo(arquivo.name, arquivo.getvalue())
+
+    return [cache[arquivo.file_id] for arquivo in arquivos]
+
+def carregar_dados(arquivos, sessao):
+    """
+    Garante layout e snapshots no repositório compartilhado; só lê do
+    disco/upload o que nenhuma sessão carregou ainda.
+    `arquivos` é uma tupla de (rotulo, chave_dataset, UploadedFile); o
+    rótulo distingue uploads de mesmo nome, a chave vem do conteúdo.
+    Retorna ({rotulo: chave_dataset}, {rotulo: relatorio_validacao}).
+    """
+    repositorio = obter_repositorio()
+    chaves = {rotulo: chave for rotulo, chave, _ in arquivos}
+
+    # Declara o uso antes de carregar: outra sessão não despeja no meio do caminho
+    chaves_sessao = [CHAVE_LAYOUT] + list(chaves.values())
+    if not arquivos:
+        chaves_sessao.append(CHAVE_SOMENTE_LAYOUT)
+    repositorio.vincular(sessao, chaves_sessao)
+
+    # Mesmo conteúdo subido duas vezes é lido uma vez só; os bytes só são
+    # copiados (getvalue) para o que ainda não está no repositório
+    faltando = {
+        chave: (arquivo.name, arquivo.getvalue())
+        for _, chave, arquivo in arquivos
+        if not repositorio.contem(chave)
+    }
+    incluir_layout = not repositorio.contem(CHAVE_LAYOUT)
+
+    if incluir_layout or faltando:
+        with st.spinner("Carregando dados..."):
+            try:
+                resultado_layout, resultados_estoque = ler_em_paralelo(incluir_layout, faltando)
+            except FileNotFoundError:
+                st.error("Arquivo de layout não encontrado na pasta.")
+                return {}, {}
+
+            if resultado_layout is not None:
+                df_layout, relatorio_layout = resultado_layout
+
+                # Layout reprovado não fica guardado: corrigido o arquivo, a próxima execução relê
+                if df_layout is None:
+                    return {}, {"Layout": relatorio_layout}
+
+                repositorio.guardar(
+                    CHAVE_LAYOUT,
+                    {'df': df_layout, 'relatorio': relatorio_layout},
+                    fixo=True,
+                )
+
+            df_layout = repositorio.obter(CHAVE_LAYOUT)['df']
+
+            for chave, (dados_estoque, relatorio) in resultados_estoque.items():
+                # Snapshot reprovado fica guardado só com o relatório (não faz o merge)
+                df_completo = None
+                if dados_estoque is not None:
+                    relatorio.update(validar_cruzamento(df_layout, dados_estoque))
+                    df_completo = montar_completo(df_layout, dados_estoque)
+
+                repositorio.guardar(chave, {'df': df_completo, 'relatorio': relatorio})
+
+    layout = repositorio.obter(CHAVE_LAYOUT)
+    relatorios = {"Layout": layout['relatorio']}
+    snapshots = {}
+
+    for rotulo, chave in chaves.items():
+        item = repositorio.obter(chave)
+        relatorios[rotulo] = item['relatorio']
+        if item['df'] is not None:
+            snapshots[rotulo] = chave
+
+    if not arquivos:
+        repositorio.obter_ou_criar(
+            CHAVE_SOMENTE_LAYOUT,
+            lambda: {'df': montar_completo(layout['df']), 'relatorio': {}},
+            fixo=True,
+        )
+        snapshots["Somente layout"] = CHAVE_SOMENTE_LAYOUT
+
+    return snapshots, relatorios
+
+# ==========================================
+# RELATÓRIO DE VALIDAÇÃO DA CARGA
+# ==========================================
+def exibir_relatorio(nome, relatorio):
+    if not relatorio:
+        return
+
+    resumo = ", ".join(f"{problema}: {formata_br(item['quantidade'])}" for problema, item in relatorio.items())
+    if tem_erro_grave(relatorio):
+        st.error(f"❌ **{nome}** reprovado na validação — {resumo}")
+    else:
+        st.warning(f"⚠️ **{nome}** — {resumo}")
+
+    with st.expander(f"🔎 Amostras da validação: {nome}"):
+        for problema, item in relatorio.items():
+            st.markdown(f"**{problema}** ({formata_br(item['quantidade'])})")
+            st.dataframe(item['amostra'], hide_index=True, use_container_width=True)
+
+# Token da sessão: quando a sessão é descartada, o repositório solta os snapshots dela.
+# Refeito se o repositório mudou (ex: "Clear cache" recria o cache_resource)
+st.session_state.sessao_dataset = obter_repositorio().garantir_sessao(
+    st.session_state.get("sessao_dataset")
+)
+
+arquivos_estoque = arquivos_estoque or []
+rotulos_estoque = rotular_uploads([a.name for a in arquivos_estoque])
+
+snapshots, relatorios = carregar_dados(
+    tuple(zip(rotulos_estoque, chaves_uploads(arquivos_estoque), arquivos_estoque)),
+    st.session_state.sessao_dataset,
+)
+
+for nome, relatorio in relatorios.items():
+    exibir_relatorio(nome, relatorio)
+
+if not snapshots:
+    st.stop()
+
+snapshot_ativo = st.sidebar.selectbox("Snapshot de Estoque", options=list(snapshots.keys()))
+chave_ativa = snapshots[snapshot_ativo]
+
+# Mesmo objeto para todas as sessões: só filtrar, nunca alterar no lugar
+df = obter_repositorio().obter(chave_ativa)['df']
+
+if df.empty:
+    st.stop()
+
+# CRIA MAPA DE CORES SEMPRE APÓS CARREGAR DF
+mapa_cores = obter_repositorio().derivar(chave_ativa, "mapa_cores", lambda: gerar_mapa_cores(df))
+
+# =====================================================
+# DASHBOARD RESUMO (INDICADORES DO CD)
+# =====================================================
+def montar_indicadores(df, mapa_cores):
+    """Figuras dos 3 indicadores; montadas uma vez por dataset e compartilhadas."""
+    import plotly.graph_objects as go
+
+    df_ocupado = df[df['Status'] == 'Ocupado']
+    df_vazio = df[df['Status'] == 'Vazio']
+
+    total_posicoes = len(df)
+    pos_ocupadas = len(df_ocupado)
+    pos_vazias = len(df_vazio)
+
+    # =====================================================
+    # 1️⃣ GRÁFICO ROSCA — OCUPAÇÃO
+    # =====================================================
+    fig_ocupacao = go.Figure(data=[go.Pie(
+        labels=['Ocupadas', 'Vazias'],
+        values=[pos_ocupadas, pos_vazias],
+        hole=0.6,
+        textinfo='label+percent',
+        hovertemplate="<b>%{label}</b><br>Qtd: %{value}<extra></extra>",
+        marker=dict(colors=['#2ca02c', '#d3d3d3'])
+    )])
+
+    fig_ocupacao.update_layout(
+        title=f"Ocupação do Armazém<br>{pos_ocupadas:,} / {total_posicoes:,} posições",
+        height=350,
+        margin=dict(t=60, b=0, l=0, r=0),
+        showlegend=False
+    )
+
+    # =====================================================
+    # 2️⃣ TOP 5 PRODUTOS (BARRA HORIZONTAL)
+    # =====================================================
+    top5 = (
+        df_ocupado
+        .groupby('Produto')['Quantidade']
+        .sum()
+        .sort_values(ascending=False)
+        .head(5)
+        .reset_index()
+    )
+
+    # go.Bar em vez de px.bar: evita importar plotly.express só para o dashboard
+    fig_top5 = go.Figure(data=[go.Bar(
+        x=top5['Quantidade'],
+        y=top5['Produto'],
+        orientation='h',
+        text=top5['Quantidade'],
+    )])
+
+    fig_top5.update_layout(
+        title="Top 5 Produtos com Maior Estoque",
+        xaxis_title='Quantidade',
+        yaxis_title='Produto',
+        height=350,
+        yaxis=dict(categoryorder='total ascending'),
+        margin=dict(t=60, b=0, l=0, r=0)
+    )
+
+    # =====================================================
+    # 3️⃣ ESTOQUE POR ÁREA (PIZZA)
+    # =====================================================
+    estoque_area = (
+        df_ocupado
+        .groupby('Área_Exibicao')['Quantidade']
+        .sum()
+        .reset_index()
+    )
+
+    cores_area = [
+        mapa_cores.get(area, '#cccccc')
+        for area in estoque_area['Área_Exibicao']
+    ]
+
+    fig_area = go.Figure(data=[go.Pie(
+        labels=estoque_area['Área_Exibicao'],
+        values=estoque_area['Quantidade'],
+        textinfo='percent+label',
+        hovertemplate="<b>%{label}</b><br>Qtd: %{value}<extra></extra>",
+        marker=dict(colors=cores_area)
+    )])
+
+    fig_area.update_layout(
+        title="Distribuição de Estoque por Área",
+        height=350,
+        margin=dict(t=60, b=0, l=0, r=0)
+    )
+
+    return fig_ocupacao, fig_top5, fig_area
+
+st.markdown("### 📊 Indicadores Gerais do Armazém")
+
+fig_ocupacao, fig_top5, fig_area = obter_repositorio().derivar(
+    chave_ativa, "indicadores", lambda: montar_indicadores(df, mapa_cores)
+)
+
+# =====================================================
+# LAYOUT EM 3 COLUNAS
+# =====================================================
+col_g1, col_g2, col_g3 = st.columns(3)
+
+with col_g1:
+    st.plotly_chart(fig_ocupacao, use_container_width=True)
+    st.caption("X = Colunas | Y = Corredores | Z = Níveis")
+
+with col_g2:
+    st.plotly_chart(fig_top5, use_container_width=True)
+
+with col_g3:
+    st.plotly_chart(fig_area, use_container_width=True)
+
+st.markdown("---")
+
+# --- BARRA LATERAL: FILTROS GERAIS ---
+st.sidebar.header("🔍 2. Filtros Globais")
+
+mostrar_estrutura = st.sidebar.toggle("Mostrar Estrutura Vazia", value=True)
+
+areas_disponiveis = [a for a in df["Área_Exibicao"].unique() if str(a) != "nan" and str(a) != "Desconhecido" and a != " ESTRUTURA VAZIA"]
+areas_disponiveis.sort()
+area_pesquisa = st.sidebar.selectbox("Pesquisa por Área", options=["Todas"] + areas_disponiveis)
+
+produto_pesquisa = st.sidebar.text_input("Pesquisa por Produto (Código)")
+endereco_pesquisa = st.sidebar.text_input("Pesquisa por Endereço (ex: 025-071-040-001)")
+
+df_ocupado = df[df['Status'] == 'Ocupado']
+if 'Vencimento' in df.columns and len(df_ocupado) > 0:
+    datas_unicas = df_ocupado['Vencimento'].dt.date.dropna().unique().tolist()
+    datas_unicas.sort()
+else:
+    datas_unicas = []
+
+data_pesquisa = st.sidebar.selectbox("Pesquisa por Data de Vencimento", options=["Todas"] + datas_unicas)
+
+# Filtros por máscara geram frames novos; sem filtro, é o próprio df compartilhado
+df_filtrado = df
+
+if not mostrar_estrutura:
+    df_filtrado = df_filtrado[df_filtrado['Status'] == 'Ocupado']
+if area_pesquisa != "Todas":
+    df_filtrado = df_filtrado[df_filtrado["Área_Exibicao"] == area_pesquisa]
+if produto_pesquisa:
+    df_filtrado = df_filtrado[(df_filtrado["Produto"].astype(str).str.contains(produto_pesquisa, na=False)) | (df_filtrado['Status'] == 'Vazio')]
+if endereco_pesquisa:
+    df_filtrado = df_filtrado[(df_filtrado["Posicao_no_deposito"].str.contains(endereco_pesquisa, na=False)) | (df_filtrado['Status'] == 'Vazio')]
+if data_pesquisa != "Todas":
+    df_filtrado = df_filtrado[(df_filtrado['Vencimento'].dt.date == data_pesquisa) | (df_filtrado['Status'] == 'Vazio')]
+
+# =====================================================
+# MEMÓRIA: COMPARTILHADO x POR SESSÃO
+# =====================================================
+with st.sidebar.expander("💾 Memória do Servidor"):
+    memoria = obter_repositorio().memoria()
+
+    # Privado desta sessão: só o que os filtros criaram (sem filtro, é o df compartilhado).
+    # Mesma medida (deep) do compartilhado, para os números serem comparáveis
+    privado_sessao = 0 if df_filtrado is df else medir_bytes(df_filtrado)
+
+    st.metric("Compartilhado (processo)", formata_mb(memoria['compartilhado']))
+    st.metric("Sem compartilhamento seria", formata_mb(memoria['sem_compartilhamento']))
+    st.caption(
+        f"{memoria['sessoes']} sessões · {memoria['datasets']} datasets · "
+        f"esta sessão: {formata_mb(memoria['por_sessao'].get(st.session_state.sessao_dataset.id, 0))} "
+        f"referenciados, {formata_mb(privado_sessao)} privados"
+    )
+
+# ==========================================
+# RESUMO DINÂMICO DOS FILTROS (PONTO 2)
+# ==========================================
+if produto_pesquisa or area_pesquisa != "Todas" or data_pesquisa != "Todas":
+    st.markdown("### 🎯 Resumo do Filtro Aplicado")
+    df_f_ocupado = df_filtrado[df_filtrado['Status'] == 'Ocupado']
+    
+    qtd_pos = len(df_f_ocupado)
+    qtd_unidades = df_f_ocupado['Quantidade'].sum()
+    qtd_produtos = df_f_ocupado['Produto'].nunique()
+    
+    c1, c2, c3 = st.columns(3)
+    c1.info(f"📍 **Posições Utilizadas:** {formata_br(qtd_pos)}")
+    c2.success(f"📦 **Unidades Totais:** {formata_br(qtd_unidades)} un")
+    
+    # Se for pesquisa por área ou data, mostramos os produtos diferentes
+    if area_pesquisa != "Todas" or data_pesquisa != "Todas":
+        c3.warning(f"🏷️ **Produtos Diferentes:** {qtd_produtos} SKUs")
+
+st.markdown("---")
+
+# ==========================================
+# ABAS DE VISUALIZAÇÃO 3D
+# ==========================================
+# on_change="rerun" deixa as abas com estado (.open): só a aba aberta monta a figura
+aba_macro, aba_micro = st.tabs(
+    ["🌐 Visão Global (Mapa do CD)", "🏗️ Visão Realista do Corredor (Porta-Paletes)"],
+    key="aba_visao",
+    on_change="rerun",
+)
+
+# Inicializa as variáveis para evitar o NameError
+selecionados_macro = []
+selecionados_micro = []
+
+# --- ABA 1: VISÃO MACRO (Galpão Inteiro) ---
+with aba_macro:
+    if aba_macro.open:
+        import plotly.express as px
+        import plotly.graph_objects as go
+        from streamlit_plotly_events import plotly_events
+
+        capacidade = obter_repositorio().derivar(chave_ativa, "capacidade", lambda: calcular_capacidade(df))
+
+        # Utilização de altura só existe quando o export traz a altura da carga
+        modos_utilizacao = {
+            rotulo: coluna for rotulo, coluna in COLUNAS_UTILIZACAO.items()
+            if coluna in capacidade['posicao'].columns
+        }
+
+        st.markdown("##### 📍 Heatmap e Radar do Galpão")
+        modo_cor = st.radio("Colorir por", ["Área"] + list(modos_utilizacao), horizontal=True, key="modo_cor_macro")
+
+        if modo_cor == "Área":
+            fig_macro = px.scatter_3d(
+                df_filtrado, x='Coluna', y='Y_Plot', z='Altura_plot', color='Cor_Plot',
+                color_discrete_map=mapa_cores, hover_name='Posicao_no_deposito',
+                hover_data={'Status': True, 'Produto': True, 'Quantidade': True, 'Vencido': True, 'Cor_Plot': False, 'Coluna': False, 'Y_Plot': False, 'Altura_plot': False,'Altura_cm': True, 'Corredor': False}
+            )
+        else:
+            # Heatmap 3D: cada posição recebe o % de utilização calculado no motor de capacidade
+            coluna_util = modos_utilizacao[modo_cor]
+            df_macro = df_filtrado.assign(**{
+                coluna_util: df_filtrado['Posicao_no_deposito'].map(capacidade['posicao'][coluna_util])
+            })
+            fig_macro = px.scatter_3d(
+                df_macro, x='Coluna', y='Y_Plot', z='Altura_plot', color=coluna_util,
+                color_continuous_scale='RdYlGn_r', range_color=[0, 100], hover_name='Posicao_no_deposito',
+                hover_data={'Status': True, 'Produto': True, 'Quantidade': True, 'Vencido': True, 'Coluna': False, 'Y_Plot': False, 'Altura_plot': False,'Altura_cm': True, 'Corredor': False},
+                labels={coluna_util: '%'}
+            )
+
+        for trace in fig_macro.data:
+            nome_legenda = trace.name
+            if nome_legenda == ' ESTRUTURA VAZIA':
+                trace.marker.color = 'rgba(150, 150, 150, 0.3)'
+                trace.marker.symbol = 'square-open' 
+                trace.marker.size = 3 
+            else:
+                trace.marker.symbol = 'square'
+                trace.marker.size = 3.5 
+            
+                # MÁGICA AQUI: Pega a cor diretamente do dado embutido no hover_data (seguro contra crash)
+                if hasattr(trace, 'customdata') and trace.customdata is not None:
+                    # O status 'Vencido' é a 4ª variável passada no hover_data (índice 3)
+                    line_colors = contorno_vencidos(np.asarray(trace.customdata)[:, 3], 'red', 'rgba(0,0,0,0)')
+                    trace.marker.line = dict(color=line_colors, width=5)
+
+        fig_macro.update_layout(
+            scene=dict(
+                xaxis={**eixo_invisivel, "title": "Colunas"},
+                yaxis={**eixo_invisivel, "title": "Corredores"},
+                zaxis={**eixo_invisivel, "title": "Níveis"},
+                aspectmode='manual',
+                aspectratio=dict(x=3.5, y=1.5, z=0.5)
+            ),
+            dragmode="turntable",
+            height=600,
+            margin=dict(l=0, r=0, b=0, t=0),
+            hoverlabel=dict(namelength=-1)
+        )
+
+        # Mostra o gráfico e captura cliques
+        selecionados_macro = plotly_events(fig_macro, click_event=True, hover_event=False, key="clique_macro")
+
+        # Verifica se houve clique
+        if selecionados_macro:
+            endereco_clicado = selecionados_macro[0]['hovertext']
+            dados_endereco = df[df['Posicao_no_deposito'] == endereco_clicado].iloc[0]
+            # Aqui você pode renderizar a ficha técnica como já fazia
+
+        # ==========================================
+        # CAPACIDADE E UTILIZAÇÃO (CORREDOR x NÍVEL)
+        # ==========================================
+        exp_capacidade = st.expander("📐 Capacidade e Utilização", expanded=False, key="exp_capacidade", on_change="rerun")
+        with exp_capacidade:
+            if exp_capacidade.open:
+                coluna_heatmap = modos_utilizacao.get(modo_cor, "Util_cubica")
+
+                grade = capacidade['corredor_nivel'].pivot(index='Nivel', columns='Corredor', values=coluna_heatmap)
+
+                fig_util = go.Figure(data=[go.Heatmap(
+                    z=grade.values,
+                    x=grade.columns,
+                    y=grade.index,
+                    zmin=0,
+                    zmax=100,
+                    colorscale='RdYlGn_r',
+                    colorbar=dict(title='%'),
+                    hovertemplate="Corredor %{x}<br>Nível %{y}<br>Utilização: %{z:.1f}%<extra></extra>"
+                )])
+
+                fig_util.update_layout(
+                    title="Utilização por Corredor x Nível" + (" (cúbica)" if coluna_heatmap == "Util_cubica" else " (altura)"),
+                    xaxis_title="Corredor",
+                    yaxis_title="Nível",
+                    height=400,
+                    margin=dict(t=60, b=0, l=0, r=0)
+                )
+
+                st.plotly_chart(fig_util, use_container_width=True)
+
+                def tabela_utilizacao(agregado, chaves):
+                    return agregado[[
+                        *chaves, 'Posicoes', 'Ocupadas',
+                        'Capacidade_m3', 'Volume_ocupado_m3', *modos_utilizacao.values()
+                    ]].rename(columns={
+                        'Área_Exibicao': 'Área',
+                        'Nivel': 'Nível',
+                        'Posicoes': 'Posições',
+                        'Capacidade_m3': 'Capacidade (m³)',
+                        'Volume_ocupado_m3': 'Volume Ocupado (m³)',
+                        'Util_cubica': 'Util. Cúbica (%)',
+                        'Util_altura': 'Util. Altura (%)',
+                    }).round(2)
+
+                # Totais por área e por nível ao lado do detalhe área x corredor
+                col_area, col_nivel = st.columns(2)
+                with col_area:
+                    st.markdown("**Utilização por Área**")
+                    st.dataframe(tabela_utilizacao(capacidade['area'], ['Área_Exibicao']), hide_index=True, use_container_width=True)
+                with col_nivel:
+                    st.markdown("**Utilização por Nível**")
+                    st.dataframe(tabela_utilizacao(capacidade['nivel'], ['Nivel']), hide_index=True, use_container_width=True)
+
+                st.markdown("**Utilização por Área / Corredor**")
+                st.dataframe(
+                    tabela_utilizacao(capacidade['area_corredor'], ['Área_Exibicao', 'Corredor']),
+                    hide_index=True, use_container_width=True,
+                )
+
+# --- ABA 2: VISÃO MICRO COM PORTA-PALETES 3D (PONTO 3) ---
+with aba_micro:
+    if aba_micro.open:
+        import plotly.express as px
+        from streamlit_plotly_events import plotly_events
+
+        st.markdown("##### 🔍 Inspeção Estrutural Realista")
+    
+        corredores_unicos = sorted(df['Corredor'].unique())
+        corredor_alvo = st.selectbox("Selecione o Corredor para renderizar a estrutura:", corredores_unicos)
+    
+        df_corredor = df_filtrado[df_filtrado['Corredor'] == corredor_alvo].copy()
+    
+        if df_corredor.empty:
+            st.info("Nenhuma posição encontrada neste corredor com os filtros atuais.")
+        else:
+            # 1. Desenha os paletes e dados flutuantes usando Scatter3D (para capturar os cliques e informações)
+            fig_micro = px.scatter_3d(
+                df_corredor, x='Coluna', y='Y_Micro', z='Altura_plot', color='Cor_Plot',
+                color_discrete_map=mapa_cores, hover_name='Posicao_no_deposito',
+                hover_data={'Status': True, 'Produto': True, 'Quantidade': True, 'Vencido': True, 'Cor_Plot': False, 'Coluna': False, 'Y_Micro': False, 'Altura_plot': False,'Altura_cm': True, 'Corredor': False}
+            )
+
+            # ------------------------------------------
+            # GUARDA OS PALLETES (para renderizar depois)
+            # ------------------------------------------
+            traces_paletes = list(fig_micro.data)
+            fig_micro.data = []
+
+            fig_micro.update_layout(scene=dict( xaxis=dict(**eixo_invisivel), yaxis=dict(**eixo_invisivel), zaxis=dict(**eixo_invisivel)))
+
+            for trace in traces_paletes:
+                nome_legenda = trace.name
+                if nome_legenda == ' ESTRUTURA VAZIA':
+                    # Palete vazio fica quase invisível
+                    trace.marker.color = 'rgba(255, 255, 255, 0.0)'
+                    trace.marker.symbol = 'square-open' 
+                    trace.marker.size = 1
+                    trace.marker.line = dict(width=0)
+                else:
+                    # Paletes ocupados
+                    trace.marker.symbol = 'square'
+                    trace.marker.size = 22 # Tamanho gigante
+                    trace.opacity = 0.92 
+                
+                    # MÁGICA AQUI também
+                    if hasattr(trace, 'customdata') and trace.customdata is not None:
+                        line_colors = contorno_vencidos(np.asarray(trace.customdata)[:, 3], 'red', 'rgba(0,0,0,1)')
+                        trace.marker.line = dict(color=line_colors, width=4)
+
+                    trace.opacity = 0.92 # Micro transparência (profundidade visual)
+
+            # ==========================================
+            # IDENTIFICA MÓDULOS REAIS DE RACK
+            # ==========================================
+            def pares_consecutivos(colunas):
+                """
+                Retorna pares de colunas vizinhas reais (dois arrays: início e fim)
+                Ex: [1,3,5,11,13] -> ([1,3,11], [3,5,13])
+                """
+                colunas = np.sort(colunas)
+
+                # módulo válido = diferença padrão (2)
+                vizinhas = np.diff(colunas) == 2
+
+                return colunas[:-1][vizinhas], colunas[1:][vizinhas]
+
+            # ==========================================
+            # ALTURAS REAIS POR ENDEREÇO (PASSO 4)
+            # ==========================================
+            alturas_reais = df_corredor.groupby('Coluna')['Altura_plot'].max()
+
+            altura_max_estrutura = alturas_reais.max()
+            niveis_reais = np.sort(df_corredor['Altura_plot'].dropna().unique())
+
+            # 2. GERAÇÃO DINÂMICA DA ESTRUTURA METÁLICA (um Mesh3d só)
+            # Cada lado: (paridade da coluna, y do montante, y das vigas frente/fundo)
+            lados = [
+                (1, -1.4, (-0.7, -1.4)),  # Lado Ímpar (Y = -1)
+                (0, 0.6, (0.6, 1.3)),     # Lado Par (Y = 1)
+            ]
+
+            caixas = []  # grupos [x, y, z, dx, dy, dz, rgb], já com o mesmo tamanho
+
+            def grupo_caixas(x, y, z, dx, dy, dz, rgb):
+                # Expande os escalares para o tamanho do grupo
+                return [*np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (x, y, z, dx, dy, dz))), rgb]
+
+            for paridade, y_montante, y_vigas in lados:
+                colunas_lado = alturas_reais[alturas_reais.index % 2 == paridade]
+                if colunas_lado.empty:
+                    continue
+
+                # Montantes: um por coluna, altura da coluna + 0.3
+                altura_coluna = colunas_lado.to_numpy()
+                caixas.append(grupo_caixas(
+                    colunas_lado.index.to_numpy() - 1.1, y_montante, 0,
+                    0.2, 0.8, altura_coluna + 0.3,
+                    sombrear_por_altura(COR_MONTANTE_RGB, altura_coluna, altura_max_estrutura),
+                ))
+
+                # Vigas: módulo x nível x (frente, fundo)
+                c1, c2 = pares_consecutivos(colunas_lado.index.to_numpy())
+                if len(c1) == 0:
+                    continue
+
+                x_inicio = np.repeat(c1 - 1.1, len(niveis_reais))
+                largura_modulo = np.repeat((c2 - c1) + 0.2, len(niveis_reais))
+                n = np.tile(niveis_reais, len(c1))
+                cor_viga = sombrear_por_altura(COR_VIGA_RGB, n, altura_max_estrutura)
+
+                for y_viga in y_vigas:
+                    caixas.append(grupo_caixas(x_inicio, y_viga, n - 0.08, largura_modulo, 0.1, 0.15, cor_viga))
+
+            if caixas:
+                # Junta todos os grupos e desenha a estrutura inteira numa trace
+                fig_micro.add_trace(criar_caixas(*(np.concatenate(partes) for partes in zip(*caixas))))
+
+            # Eixos Invisíveis para efeito de Jogo/Maquete
+            eixo_invisivel = dict(showbackground=False, showgrid=False, zeroline=False, showticklabels=False, title='')
+            tamanho_x = max(2, len(df_corredor['Coluna'].unique()) * 0.15)
+
+            # ------------------------------------------
+            # REINSERE PALLETES (na frente da estrutura)
+            # ------------------------------------------
+            for t in traces_paletes:
+                fig_micro.add_trace(t)
+
+            tamanho_x = 1 if not np.isfinite(tamanho_x) else float(tamanho_x)
+
+            # ==============================
+            # SEGURANÇA DO ASPECT RATIO
+            # ==============================
+            try:
+                tamanho_x = float(tamanho_x)
+                if tamanho_x <= 0:
+                    tamanho_x = 1
+            except:
+                tamanho_x = 1
+
+            # ==========================================
+            # PROTEÇÃO CONTRA ERRO DE ESCALA 3D (Plotly bug)
+            # ==========================================
+            tamanho_x = max(float(tamanho_x), 0.1)
+
+            fig_micro.update_layout(
+                scene=dict(
+                    xaxis=eixo_invisivel, 
+                    yaxis=eixo_invisivel,
+                    zaxis=eixo_invisivel,
+                    aspectmode='manual',
+                    aspectratio=dict(x=tamanho_x, y=0.5, z=0.8),
+                    camera=dict(
+                        eye=dict(x=1.6, y=1.6, z=1.2)
+                    )
+                    # O bloco lightposition foi completamente removido daqui
+                ),
+                paper_bgcolor='rgba(0,0,0,0)', 
+                plot_bgcolor='rgba(0,0,0,0)',
+                dragmode="turntable", 
+                height=800, 
+                margin=dict(l=0, r=0, b=0, t=0), 
+                showlegend=False, 
+                hoverlabel=dict(namelength=-1)
+            )
+            # Mostra o gráfico e captura cliques
+            selecionados_micro = plotly_events(fig_micro, click_event=True, hover_event=False, key="clique_micro")
+
+            # Verifica se houve clique
+            if selecionados_micro:
+                endereco_clicado = selecionados_micro[0]['hovertext']
+                dados_endereco = df[df['Posicao_no_deposito'] == endereco_clicado].iloc[0]
+                # Renderizar ficha técnica como antes
+
+
+# ==========================================
+# FICHA COMPLETA DO CLIQUE (PONTO 1)
+# ==========================================
+# Verifica se houve clique na Macro ou Micro
+if selecionados_macro or selecionados_micro:
+    
+    if selecionados_macro:
+        endereco_clicado = selecionados_macro[0]['hovertext']
+    else:
+        endereco_clicado = selecionados_micro[0]['hovertext']
+    
+    dados_endereco = df[df['Posicao_no_deposito'] == endereco_clicado].iloc[0]
+
+    st.markdown("---")
+    st.markdown(f"### 📋 Ficha Técnica: Endereço `{endereco_clicado}`")
+    
+    col_d1, col_d2, col_d3 = st.columns(3)
+    with col_d1:
+        st.write(f"**🟢 Status:** {dados_endereco['Status']}")
+        st.write(f"**🏢 Área Armaz.:** {dados_endereco['Área_Exibicao']}")
+        st.write(f"**📏 Tipo Depósito:** {dados_endereco.get('Tipo_de_deposito', 'N/A')}")
+        
+    with col_d2:
+        st.write(f"**🏷️ Código Produto:** {dados_endereco['Produto']}")
+        st.write(f"**📝 Descrição:** {dados_endereco['Descrição produto']}")
+        st.write(f"**📦 Unid. Comercial (UC):** {dados_endereco['Unidade comercial']}")
+        
+    with col_d3:
+        st.write(f"**🔢 Quantidade:** {formata_br(dados_endereco['Quantidade'])} un")
+        if pd.notna(dados_endereco['Vencimento']):
+            data_formatada = dados_endereco['Vencimento'].strftime('%d/%m/%Y')
+            if dados_endereco['Vencido']:
+                st.error(f"**⏳ Validade:** {data_formatada} (VENCIDO)")
+            else:
+                st.success(f"**⏳ Validade:** {data_formatada}")
+        else:
+            st.write("**⏳ Validade:** N/A")
\ No newline at end of file
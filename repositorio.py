@@ -0,0 +1,169 @@
+import collections
+import hashlib
+import threading
+import uuid
+import weakref
+
+import pandas as pd
+
+
+# ==========================================
+# CHAVE DE UM ARQUIVO (CONTEÚDO, NÃO O NOME)
+# ==========================================
+def chave_arquivo(nome, conteudo):
+    """Dois operadores subindo o mesmo export compartilham o mesmo snapshot."""
+    formato = 'csv' if nome.endswith('.csv') else 'excel'
+    return f"{formato}:{hashlib.sha256(conteudo).hexdigest()}"
+
+
+def medir_bytes(obj):
+    """Memória aproximada de DataFrames (inclusive dentro de dict/list/tuple)."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, dict):
+        return sum(medir_bytes(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(medir_bytes(v) for v in obj)
+    return 0
+
+
+class SessaoDataset:
+    """Token guardado no session_state; quando a sessão some, as referências caem."""
+
+    def __init__(self, id_repositorio):
+        self.id = uuid.uuid4().hex
+        # Repositório que registrou o token (o finalizer só solta neste)
+        self.id_repositorio = id_repositorio
+
+
+# ==========================================
+# REPOSITÓRIO COMPARTILHADO (UM POR PROCESSO)
+# ==========================================
+class RepositorioDatasets:
+    """
+    Guarda layout e snapshots uma única vez por processo. As sessões
+    recebem o próprio objeto (sem cópia) e só declaram quais chaves usam;
+    snapshot sem nenhuma sessão referenciando sai da memória.
+
+    Os DataFrames entregues são somente leitura por contrato: filtre,
+    nunca altere no lugar.
+    """
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self._trava = threading.Lock()
+        self._itens = {}     # chave -> {'dados', 'bytes', 'fixo', 'derivados'}
+        self._sessoes = {}   # id da sessão -> set de chaves
+        # Sessões encerradas esperando a trava (preenchido pelo finalizer)
+        self._encerradas = collections.deque()
+
+    # ---------- sessões ----------
+    def registrar_sessao(self):
+        sessao = SessaoDataset(self.id)
+        with self._trava:
+            self._sessoes[sessao.id] = set()
+        # Só enfileira: o finalizer pode rodar dentro do GC numa thread que já
+        # segura a trava (token em ciclo de referência) e travaria nela mesma
+        weakref.finalize(sessao, self._encerradas.append, sessao.id)
+        return sessao
+
+    def garantir_sessao(self, sessao):
+        """
+        Devolve o token se ele foi registrado aqui; senão registra um novo.
+        Após um "Clear cache" o st.cache_resource cria outro repositório e
+        os tokens antigos continuam presos ao finalizer do repositório velho.
+        """
+        if sessao is not None and sessao.id_repositorio == self.id:
+            return sessao
+        return self.registrar_sessao()
+
+    def _drenar_encerradas(self):
+        """Remove as sessões encerradas. Chamar com a trava."""
+        while self._encerradas:
+            self._sessoes.pop(self._encerradas.popleft(), None)
+
+    def vincular(self, sessao, chaves):
+        """
+        Troca as chaves que a sessão usa e libera o que ficou sem dono.
+        Token de outro repositório é recusado: ninguém o soltaria daqui.
+        """
+        with self._trava:
+            if sessao.id not in self._sessoes:
+                raise KeyError(f"Sessão não registrada neste repositório: {sessao.id}")
+            self._drenar_encerradas()
+            self._sessoes[sessao.id] = set(chaves)
+            self._despejar_orfaos()
+
+    def _despejar_orfaos(self):
+        em_uso = set().union(*self._sessoes.values())
+        for chave in [c for c, item in self._itens.items() if not item['fixo'] and c not in em_uso]:
+            del self._itens[chave]
+
+    # ---------- dados ----------
+    def contem(self, chave):
+        with self._trava:
+            return chave in self._itens
+
+    def obter(self, chave):
+        with self._trava:
+            return self._itens[chave]['dados']
+
+    def guardar(self, chave, dados, fixo=False):
+        """Se outra sessão guardou primeiro, vale o que já está lá."""
+        bytes_dados = medir_bytes(dados)
+        with self._trava:
+            item = self._itens.setdefault(
+                chave, {'dados': dados, 'bytes': bytes_dados, 'fixo': fixo, 'derivados': {}}
+            )
+            return item['dados']
+
+    def obter_ou_criar(self, chave, criar, fixo=False):
+        if self.contem(chave):
+            return self.obter(chave)
+        return self.guardar(chave, criar(), fixo=fixo)
+
+    def derivar(self, chave, nome, calcular):
+        """Resultado derivado do dataset (ex: capacidade), também compartilhado."""
+        with self._trava:
+            derivados = self._itens[chave]['derivados']
+            if nome in derivados:
+                return derivados[nome][0]
+
+        valor = calcular()
+        bytes_valor = medir_bytes(valor)
+
+        with self._trava:
+            item = self._itens.get(chave)
+            if item is None:
+                return valor  # despejado enquanto calculava: não guarda
+            return item['derivados'].setdefault(nome, (valor, bytes_valor))[0]
+
+    # ---------- memória ----------
+    def memoria(self):
+        """
+        compartilhado: o que o processo guarda de fato.
+        por_sessao: quanto cada sessão ocuparia se tivesse cópia própria.
+        """
+        with self._trava:
+            if self._encerradas:
+                self._drenar_encerradas()
+                self._despejar_orfaos()
+            bytes_item = {
+                chave: item['bytes'] + sum(b for _, b in item['derivados'].values())
+                for chave, item in self._itens.items()
+            }
+            por_sessao = {
+                id_sessao: sum(bytes_item.get(c, 0) for c in chaves)
+                for id_sessao, chaves in self._sessoes.items()
+            }
+
+        return {
+            'compartilhado': sum(bytes_item.values()),
+            'datasets': len(bytes_item),
+            'sessoes': len(por_sessao),
+            'por_sessao': por_sessao,
+            # Sem o repositório cada sessão teria sua própria cópia
+            'sem_compartilhamento': sum(por_sessao.values()),
+        }
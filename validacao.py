@@ -0,0 +1,153 @@
+import pandas as pd
+
+# Endereço SAP: Corredor-Coluna-Nível-Subdivisão (ex: 025-071-040-001)
+PADRAO_ENDERECO = r'\d{3}-\d{3}-\d{3}-\d{3}'
+
+# '1.234' sem vírgula na coluna: milhar (export BR) ou decimal? Não dá para saber
+PADRAO_MILHAR = r'-?\d{1,3}(\.\d{3})+'
+
+COLUNAS_LAYOUT = ['Posicao_no_deposito', 'Area_armazmto', 'Tpposicao_deposito']
+
+# Janela de vencimento plausível (fora disso é erro de digitação/export)
+ANO_MINIMO_VENCIMENTO = 2000
+ANOS_MAXIMOS_VENCIMENTO = 30
+
+TAMANHO_AMOSTRA = 5
+
+
+# ==========================================
+# RELATÓRIO: {problema: {quantidade, grave, amostra}}
+# ==========================================
+def _registrar(relatorio, problema, mascara, df, grave):
+    quantidade = int(mascara.sum())
+    if quantidade:
+        relatorio[problema] = {
+            'quantidade': quantidade,
+            'grave': grave,
+            'amostra': df.loc[mascara].head(TAMANHO_AMOSTRA),
+        }
+
+
+def _colunas_ausentes(relatorio, df, colunas):
+    ausentes = [c for c in colunas if c not in df.columns]
+    if ausentes:
+        relatorio['Colunas obrigatórias ausentes'] = {
+            'quantidade': len(ausentes),
+            'grave': True,
+            'amostra': pd.DataFrame({'Coluna': ausentes}),
+        }
+    return ausentes
+
+
+def tem_erro_grave(relatorio):
+    return any(item['grave'] for item in relatorio.values())
+
+
+def _nao_convertida(convertida, original):
+    """Preenchida no arquivo mas vazia depois da conversão."""
+    if original is None:
+        return False
+    return convertida.isna() & original.notna() & (original.astype(str).str.strip() != '')
+
+
+def celulas_texto(serie):
+    """Células que vieram como texto (no Excel os números já chegam como número)."""
+    return serie.map(lambda valor: isinstance(valor, str)).astype(bool)
+
+
+def numero_ambiguo(original):
+    """
+    O formato decimal vale para a coluna inteira: se alguma célula tem
+    vírgula, o ponto é milhar em todas. Sem vírgula na coluna, '1.234'
+    tanto pode ser 1234 quanto 1,234.
+    """
+    texto = original[celulas_texto(original)].astype(str).str.strip()
+    if texto.str.contains(',', regex=False).any():
+        return pd.Series(False, index=original.index)
+    return texto.str.fullmatch(PADRAO_MILHAR).reindex(original.index, fill_value=False).astype(bool)
+
+
+def _ambiguo(original):
+    if original is None:
+        return pd.Series(False, dtype=bool)
+    return numero_ambiguo(original)
+
+
+def endereco_malformado(enderecos):
+    return ~enderecos.astype(str).str.fullmatch(PADRAO_ENDERECO)
+
+
+# ==========================================
+# VALIDAÇÃO DO LAYOUT (RODA NO WORKER)
+# ==========================================
+def validar_layout(df_layout):
+    """Endereço fora do padrão ou duplicado quebra a montagem 3D: ambos são graves."""
+    relatorio = {}
+    if _colunas_ausentes(relatorio, df_layout, COLUNAS_LAYOUT):
+        return relatorio
+
+    enderecos = df_layout['Posicao_no_deposito']
+    _registrar(relatorio, 'Endereço malformado no layout', endereco_malformado(enderecos), df_layout, grave=True)
+    _registrar(relatorio, 'Endereço duplicado no layout', enderecos.duplicated(keep=False), df_layout, grave=True)
+    return relatorio
+
+
+# ==========================================
+# VALIDAÇÃO DO ESTOQUE (RODA NO WORKER)
+# ==========================================
+def validar_estoque(dados_estoque, originais=None):
+    """
+    Espera as colunas numéricas e o Vencimento já convertidos; `originais`
+    traz essas colunas como vieram do arquivo: o que era preenchido e
+    virou NaN/NaT não é valor válido.
+    """
+    relatorio = {}
+    originais = originais or {}
+    if _colunas_ausentes(relatorio, dados_estoque, ['Posicao_no_deposito']):
+        return relatorio
+
+    # Endereços fora do padrão (docas, pulmão...) só não aparecem no 3D
+    _registrar(
+        relatorio, 'Endereço malformado no estoque',
+        endereco_malformado(dados_estoque['Posicao_no_deposito']), dados_estoque, grave=False,
+    )
+
+    if 'Quantidade' in dados_estoque.columns:
+        quantidade = dados_estoque['Quantidade']
+        ambigua = _ambiguo(originais.get('Quantidade'))
+        invalida = (quantidade < 0) | (_nao_convertida(quantidade, originais.get('Quantidade')) & ~ambigua)
+        _registrar(relatorio, 'Quantidade negativa ou não numérica', invalida, dados_estoque, grave=True)
+        _registrar(relatorio, 'Quantidade ambígua (1.234: milhar ou decimal?)', ambigua, dados_estoque, grave=True)
+
+    # Volume/altura ilegíveis não barram o arquivo: a posição conta como cheia
+    for coluna in ['Volume', 'Altura']:
+        if coluna in dados_estoque.columns:
+            ambiguo = _ambiguo(originais.get(coluna))
+            _registrar(
+                relatorio, f'{coluna} não numérico (posição conta como cheia)',
+                _nao_convertida(dados_estoque[coluna], originais.get(coluna)) & ~ambiguo, dados_estoque, grave=False,
+            )
+            _registrar(
+                relatorio, f'{coluna} ambíguo, 1.234: milhar ou decimal? (posição conta como cheia)',
+                ambiguo, dados_estoque, grave=False,
+            )
+
+    if 'Vencimento' in dados_estoque.columns:
+        vencimento = dados_estoque['Vencimento']
+        limite = pd.Timestamp.today() + pd.DateOffset(years=ANOS_MAXIMOS_VENCIMENTO)
+        fora_da_janela = (vencimento.dt.year < ANO_MINIMO_VENCIMENTO) | (vencimento > limite)
+        invalida = fora_da_janela | _nao_convertida(vencimento, originais.get('Vencimento'))
+        _registrar(relatorio, 'Data de vencimento impossível', invalida, dados_estoque, grave=True)
+
+    return relatorio
+
+
+# ==========================================
+# CRUZAMENTO ESTOQUE x LAYOUT (ANTES DO MERGE)
+# ==========================================
+def validar_cruzamento(df_layout, dados_estoque):
+    relatorio = {}
+    formato_ok = ~endereco_malformado(dados_estoque['Posicao_no_deposito'])
+    fora_do_layout = formato_ok & ~dados_estoque['Posicao_no_deposito'].isin(df_layout['Posicao_no_deposito'])
+    _registrar(relatorio, 'Endereço do estoque ausente no layout', fora_do_layout, dados_estoque, grave=False)
+    return relatorio